@@ -1,11 +1,29 @@
 from aiogram import Bot
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from core.config import settings as config
 
+try:
+    import orjson
+
+    # orjson заметно быстрее stdlib json на payload'ах Bot API
+    _json_kwargs = {
+        "json_loads": orjson.loads,
+        "json_dumps": lambda obj: orjson.dumps(obj).decode(),
+    }
+except ImportError:
+    _json_kwargs = {}
+
+# Одна HTTP-сессия на весь процесс: keep-alive и DNS-кэш переиспользуются
+# всеми рассылками вместо нового TLS-handshake на каждый запрос.
+# Лимит соединений и TTL DNS-кэша — штатные aiogram (100 и 3600 с)
+session = AiohttpSession(**_json_kwargs)
+
 # Единственный экземпляр бота
 bot = Bot(
     token=config.TELEGRAM_BOT_TOKEN,
+    session=session,
     default=DefaultBotProperties(parse_mode=ParseMode.HTML),
 )
 
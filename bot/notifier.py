@@ -1,69 +1,79 @@
 # notifier.py
 from typing import Dict, Any, List
 from aiogram import Bot
-from aiogram.exceptions import TelegramAPIError
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
 from aiogram.enums import ParseMode
-from aiogram.utils.keyboard import InlineKeyboardBuilder
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from core.config import settings as config
 from logger import get_logger
 from services.db.sync_pg_manager import get_sync_postgres_manager
 import asyncio
 from datetime import datetime
+from operator import itemgetter
 
 logger = get_logger()
 
 
+_SENTIMENT_EMOJI = {"Позитивная": "😊", "Негативная": "😔", "Нейтральная": "😐"}
+
+# Статусы доставки одного уведомления
+_SENT, _FAILED, _BLOCKED = range(3)
+
+_analysis_fields = itemgetter(
+    "sentiment", "hashtags_formatted", "channel_title", "summary", "message_link"
+)
+
+
+def get_sentiment_emoji(sentiment: str) -> str:
+    """Возвращает эмодзи для тональности."""
+    return _SENTIMENT_EMOJI.get(sentiment, "🤔")
+
+
+def get_priority_emoji(hashtags: List[str]) -> str:
+    """Определяет приоритет новости по хештегам."""
+    if not config.high_priority_hashtags_set.isdisjoint(hashtags):
+        return "🔥"
+    return "📰"
+
+
 class NotificationTemplate:
     """Шаблоны для уведомлений."""
 
-    @staticmethod
-    def get_sentiment_emoji(sentiment: str) -> str:
-        """Возвращает эмодзи для тональности."""
-        return {"Позитивная": "😊", "Негативная": "😔", "Нейтральная": "😐"}.get(
-            sentiment, "🤔"
-        )
-
-    @staticmethod
-    def get_priority_emoji(hashtags: List[str]) -> str:
-        """Определяет приоритет новости по хештегам."""
-        high_priority = ["происшествия", "политика", "экономика"]
-        if any(tag in high_priority for tag in hashtags):
-            return "🔥"
-        return "📰"
+    get_sentiment_emoji = staticmethod(get_sentiment_emoji)
+    get_priority_emoji = staticmethod(get_priority_emoji)
 
     @staticmethod
     def format_analysis_message(analysis_data: Dict[str, Any]) -> str:
         """Форматирует сообщение с анализом новости."""
-        sentiment_emoji = NotificationTemplate.get_sentiment_emoji(
-            analysis_data["sentiment"]
+        sentiment, tags, channel_title, summary, link = _analysis_fields(
+            analysis_data
         )
-        hashtags_list = (
-            analysis_data.get("hashtags_formatted", "").replace("#", "").split()
-        )
-        priority_emoji = NotificationTemplate.get_priority_emoji(hashtags_list)
+        priority_emoji = get_priority_emoji(tags.replace("#", "").split())
 
-        # Обрезаем длинные заголовки каналов
-        channel_title = analysis_data["channel_title"]
-        if len(channel_title) > 30:
-            channel_title = channel_title[:27] + "..."
+        # Обрезаем длинные заголовки каналов (короткие не копируются)
+        limit = config.MAX_CHANNEL_TITLE_DISPLAY
+        if len(channel_title) > limit:
+            channel_title = channel_title[: limit - 3] + "..."
 
         message_text = (
             f"{priority_emoji} Новость из «{channel_title}»\n\n"
-            f"📝 Краткое содержание:\n{analysis_data['summary']}\n\n"
-            f"🎭 Тональность: {sentiment_emoji} {analysis_data['sentiment']}\n\n"
-            f"🏷️ Теги: {analysis_data['hashtags_formatted']}\n\n"
-            f"🔗 Читать полностью: {analysis_data['message_link']}\n\n"
+            f"📝 Краткое содержание:\n{summary}\n\n"
+            f"🎭 Тональность: {get_sentiment_emoji(sentiment)} {sentiment}\n\n"
+            f"🏷️ Теги: {tags}\n\n"
+            f"🔗 Читать полностью: {link}\n\n"
             f"⏰ {datetime.now().strftime('%H:%M')}"
         )
 
         return message_text
 
     @staticmethod
-    def get_notification_keyboard(message_link: str) -> InlineKeyboardBuilder:
+    def get_notification_keyboard(message_link: str) -> InlineKeyboardMarkup:
         """Создает клавиатуру для уведомления."""
-        builder = InlineKeyboardBuilder()
-        builder.button(text="📖 Читать полностью", url=message_link)
-        builder.adjust(1)
-        return builder
+        return InlineKeyboardMarkup(
+            inline_keyboard=[
+                [InlineKeyboardButton(text="📖 Читать полностью", url=message_link)]
+            ]
+        )
 
 
 class NotificationManager:
@@ -76,6 +86,78 @@ class NotificationManager:
             "total_failed": 0,
             "blocked_users": set(),
         }
+        # Пауза после 429 общая для всех рассылок: один RetryAfter
+        # останавливает все параллельные отправки, а не только текущую
+        self._retry_after_until: float = 0.0
+        self._resume = asyncio.Event()
+        self._resume.set()
+
+    async def _wait_rate_limit(self):
+        """Дожидается окончания паузы, запрошенной Telegram."""
+        await self._resume.wait()
+        delay = self._retry_after_until - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _backoff(self, retry_after: float):
+        """Приостанавливает все отправки на retry_after секунд."""
+        loop = asyncio.get_running_loop()
+        self._retry_after_until = max(
+            self._retry_after_until, loop.time() + retry_after
+        )
+        self._resume.clear()
+        try:
+            await asyncio.sleep(retry_after)
+        finally:
+            self._resume.set()
+
+    async def _send(self, user_id: int, message_text: str, reply_markup):
+        """Отправляет сообщение с учетом TelegramRetryAfter (HTTP 429)."""
+        for attempt in range(2):
+            await self._wait_rate_limit()
+            try:
+                await self.bot.send_message(
+                    chat_id=user_id,
+                    text=message_text,
+                    parse_mode=None,  # Отключаем markdown для избежания ошибок
+                    reply_markup=reply_markup,
+                    disable_web_page_preview=True,
+                )
+                return
+            except TelegramRetryAfter as e:
+                # Повторяем один раз; повторный отказ обработает вызывающий код
+                if attempt:
+                    raise
+                logger.warning(
+                    f"⏳ Лимит Telegram: пауза {e.retry_after}с для всех отправок"
+                )
+                await self._backoff(e.retry_after)
+
+    async def _deliver(self, user_id: int, message_text: str, reply_markup) -> int:
+        """Отправляет уведомление одному пользователю и возвращает статус."""
+        try:
+            await self._send(user_id, message_text, reply_markup)
+            # Небольшая задержка между отправками для избежания rate limits
+            await asyncio.sleep(0.05)
+            return _SENT
+
+        except TelegramAPIError as e:
+            error_msg = str(e).lower()
+
+            if "bot was blocked" in error_msg or "user is deactivated" in error_msg:
+                logger.info(
+                    f"Пользователь {user_id} заблокировал бота или деактивирован"
+                )
+                return _BLOCKED
+
+            logger.warning(
+                f"Не удалось отправить уведомление пользователю {user_id}: {e}"
+            )
+            return _FAILED
+
+        except Exception as e:
+            logger.error(f"Неожиданная ошибка при отправке пользователю {user_id}: {e}")
+            return _FAILED
 
     async def send_notification(self, analysis_data: Dict[str, Any]):
         """Отправляет уведомление всем подписчикам."""
@@ -84,7 +166,10 @@ class NotificationManager:
         try:
             data_manager = get_sync_postgres_manager()
             if data_manager:
-                subscribers = data_manager.get_all_subscribers()  # type: ignore
+                # psycopg2 блокирующий — выносим запрос из event loop
+                subscribers = await asyncio.to_thread(
+                    data_manager.get_all_subscribers  # type: ignore
+                )
             else:
                 logger.error("Data manager не инициализирован")
                 return
@@ -101,70 +186,42 @@ class NotificationManager:
             analysis_data["message_link"]
         )
 
-        successful_sends = 0
-        failed_sends = 0
         filtered_sends = 0
-
-        for user_id in subscribers:
-            # Пропускаем заблокированных пользователей
-            if user_id in self.stats["blocked_users"]:
-                continue
-
-            try:
-                # Проверяем настройки пользователя
-                sentiment = analysis_data.get("sentiment")
-                hashtags = analysis_data.get("hashtags", [])
-
-                # Пропускаем проверку настроек для упрощения
-                # В будущем можно добавить логику фильтрации
-                # if (
-                #     data_manager
-                #     and not data_manager.should_send_notification(  # type: ignore
-                #         user_id, sentiment, hashtags
-                #     )
-                # ):
-                #     filtered_sends += 1
-                #     continue
-
-                await self.bot.send_message(
-                    chat_id=user_id,
-                    text=message_text,
-                    parse_mode=None,  # Отключаем markdown для избежания ошибок
-                    reply_markup=keyboard.as_markup(),
-                    disable_web_page_preview=True,
-                )
-                successful_sends += 1
-
-                # Небольшая задержка между отправками для избежания rate limits
-                await asyncio.sleep(0.05)
-
-            except TelegramAPIError as e:
-                failed_sends += 1
-                error_msg = str(e).lower()
-
-                if "bot was blocked" in error_msg or "user is deactivated" in error_msg:
-                    logger.info(
-                        f"Пользователь {user_id} заблокировал бота или деактивирован"
-                    )
-                    self.stats["blocked_users"].add(user_id)
-                    # Можно удалить из подписчиков
-                    dm = get_sync_postgres_manager()
-                    if dm:
-                        dm.remove_subscriber(user_id)  # type: ignore
-                else:
-                    logger.warning(
-                        f"Не удалось отправить уведомление пользователю {user_id}: {e}"
-                    )
-
-            except Exception as e:
-                failed_sends += 1
-                logger.error(
-                    f"Неожиданная ошибка при отправке пользователю {user_id}: {e}"
-                )
-
-        # Обновляем статистику
+        blocked_users = self.stats["blocked_users"]
+        # Пропускаем заблокированных пользователей
+        recipients = [uid for uid in subscribers if uid not in blocked_users]
+        results = []
+
+        for user_id in recipients:
+            # Пропускаем проверку настроек для упрощения
+            # В будущем можно добавить логику фильтрации
+            # if (
+            #     data_manager
+            #     and not data_manager.should_send_notification(  # type: ignore
+            #         user_id, analysis_data.get("sentiment"),
+            #         analysis_data.get("hashtags", []),
+            #     )
+            # ):
+            #     filtered_sends += 1
+            #     continue
+            results.append(await self._deliver(user_id, message_text, keyboard))
+
+        successful_sends = results.count(_SENT)
+        failed_sends = len(results) - successful_sends
+        newly_blocked = [
+            uid for uid, status in zip(recipients, results) if status == _BLOCKED
+        ]
+
+        # Обновляем статистику один раз за рассылку
         self.stats["total_sent"] += successful_sends
         self.stats["total_failed"] += failed_sends
+        if newly_blocked:
+            blocked_users.update(newly_blocked)
+            # Можно удалить из подписчиков
+            for user_id in newly_blocked:
+                await asyncio.to_thread(
+                    data_manager.remove_subscriber, user_id  # type: ignore
+                )
 
         logger.info(
             f"📊 Уведомление отправлено: ✅ {successful_sends}, "
@@ -195,6 +252,9 @@ def get_notification_manager(bot: Bot) -> NotificationManager:
     global _notification_manager
     if _notification_manager is None:
         _notification_manager = NotificationManager(bot)
+    elif _notification_manager.bot is not bot:
+        # Менеджер привязан к первому боту и его HTTP-сессии
+        logger.warning("get_notification_manager вызван с другим экземпляром Bot")
     return _notification_manager
 
 
@@ -203,57 +263,3 @@ async def send_analysis_result(bot: Bot, analysis_data: Dict[str, Any]):
     manager = get_notification_manager(bot)
     await manager.send_notification(analysis_data)
 
-
-# Обратная совместимость - оставляем старую функцию
-async def send_analysis_result_legacy(bot: Bot, analysis_data: Dict[str, Any]):
-    """
-    Старая версия отправки уведомлений (для обратной совместимости).
-    """
-    dm = get_sync_postgres_manager()
-    subscribers = dm.get_all_subscribers() if dm else []  # type: ignore
-    if not subscribers:
-        logger.info("Подписчики для уведомлений не найдены. Пропускаю отправку.")
-        return
-
-    sentiment_to_hashtag = {
-        "Позитивная": "#позитивная_новость",
-        "Негативная": "#негативная_новость",
-        "Нейтральная": "#нейтральная_новость",
-    }
-    sentiment_hashtag = sentiment_to_hashtag.get(analysis_data["sentiment"], "#новость")
-
-    message_text = (
-        f"Анализ из «{analysis_data['channel_title']}»\n\n"
-        f"Краткое содержание:\n{analysis_data['summary']}\n\n"
-        f"Оригинал: {analysis_data['message_link']}\n\n"
-        f"{analysis_data['hashtags_formatted']}\n"
-        f"{sentiment_hashtag}"
-    )
-
-    successful_sends = 0
-    for user_id in subscribers:
-        try:
-            await bot.send_message(
-                chat_id=user_id,
-                text=message_text,
-                parse_mode=None,
-                disable_web_page_preview=True,
-            )
-            successful_sends += 1
-        except TelegramAPIError as e:
-            logger.warning(
-                f"Не удалось отправить уведомление пользователю {user_id}: {e}"
-            )
-            if "bot was blocked" in str(e):
-                logger.info(
-                    f"Пользователь {user_id} заблокировал бота. Удаляю из подписчиков."
-                )
-                dm = get_sync_postgres_manager()
-                if dm:
-                    dm.remove_subscriber(user_id)  # type: ignore
-        except Exception as e:
-            logger.error(f"Ошибка при отправке уведомления пользователю {user_id}: {e}")
-
-    logger.info(
-        f"Результат анализа отправлен {successful_sends}/{len(subscribers)} подписчикам."
-    )
@@ -11,8 +11,8 @@ from __future__ import annotations
 Для быстрой настройки измените значения по умолчанию ниже или используйте .env файл.
 """
 
-from functools import lru_cache
-from typing import List, Dict
+from functools import cached_property
+from typing import List, Dict, Tuple
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -94,6 +94,12 @@ class Settings(BaseSettings):
         description="Название LLM модели (например: ilyagusev/saiga_llama3, llama3.2, gemma2)",
     )
 
+    # Сколько Ollama держит модель (и KV-кэш общего префикса промпта) в памяти
+    OLLAMA_KEEP_ALIVE: str = Field(
+        "30m",
+        description="Время удержания модели в памяти Ollama между запросами (например: 5m, 1h, -1)",
+    )
+
     # Максимальная длина текста для анализа (символы)
     MAX_TEXT_LENGTH_FOR_ANALYSIS: int = Field(
         9000,
@@ -454,12 +460,17 @@ class Settings(BaseSettings):
     # 🎯 ВСПОМОГАТЕЛЬНЫЕ СВОЙСТВА
     # =====================================
 
-    @property
-    def channel_ids(self) -> List[str]:
-        """Возвращает список ID каналов для мониторинга."""
-        return [c.strip() for c in self.TELEGRAM_CHANNEL_IDS.split(",") if c.strip()]
+    # Настройки не меняются после загрузки, поэтому производные значения
+    # вычисляются один раз при первом обращении
+
+    @cached_property
+    def channel_ids(self) -> Tuple[str, ...]:
+        """Возвращает ID каналов для мониторинга."""
+        return tuple(
+            c.strip() for c in self.TELEGRAM_CHANNEL_IDS.split(",") if c.strip()
+        )
 
-    @property
+    @cached_property
     def sentiment_emoji_map(self) -> Dict[str, str]:
         """Маппинг тональности на эмодзи."""
         return {
@@ -468,7 +479,12 @@ class Settings(BaseSettings):
             "Нейтральная": self.EMOJI_NEUTRAL,
         }
 
-    @property
+    @cached_property
+    def high_priority_hashtags_set(self) -> frozenset[str]:
+        """Приоритетные хештеги для проверки принадлежности за O(1)."""
+        return frozenset(self.HIGH_PRIORITY_HASHTAGS)
+
+    @cached_property
     def sentiment_filter_map(self) -> Dict[str, str]:
         """Маппинг фильтров тональности."""
         return {
@@ -478,14 +494,16 @@ class Settings(BaseSettings):
         }
 
 
-@lru_cache
+# Единственный экземпляр настроек (создается один раз при импорте)
+_settings = Settings()
+
+
 def get_settings() -> Settings:
-    """Возвращает единственный экземпляр настроек (кэшированный)."""
-    return Settings()
+    """Возвращает единственный экземпляр настроек."""
+    return _settings
 
 
-# Единственный экземпляр настроек
-settings = get_settings()
+settings = _settings
 
 
 # =====================================
@@ -10,21 +10,26 @@ Unified Test Runner for News Analysis Evaluation System
 
 Запуск с конкретной конфигурацией БД:
     python evaluation/run_all_tests.py --tests performance --db-config custom_db.json
+
+Ограничение числа одновременно идущих тестов:
+    python evaluation/run_all_tests.py --all --concurrency 2
 """
 
 import asyncio
 import argparse
 import json
+import os
 import sys
 import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 import logging
 
 # Добавляем корневую директорию в путь
 sys.path.append(str(Path(__file__).parent.parent))
 
 # Импорты тестов
+from evaluation.tests.base_evaluator import BaseEvaluator, dumps_report
 from evaluation.tests.rouge_test import ROUGETest
 from evaluation.tests.semantic_test import SemanticTest
 from evaluation.tests.hallucination_test import HallucinationTest
@@ -39,6 +44,74 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_RULE = "=" * 80
+_DIVIDER = "-" * 50
+
+
+def _format_rouge(test_results: Dict[str, Any]) -> List[str]:
+    avg_rouge = test_results.get("average_rouge_scores", {})
+    return [
+        f"   📊 ROUGE-1: {avg_rouge.get('rouge1_f', 0):.3f}",
+        f"   📊 ROUGE-2: {avg_rouge.get('rouge2_f', 0):.3f}",
+        f"   📊 ROUGE-L: {avg_rouge.get('rougeL_f', 0):.3f}",
+    ]
+
+
+def _format_semantic(test_results: Dict[str, Any]) -> List[str]:
+    return [
+        f"   📊 BERTScore F1: {test_results.get('average_bertscore_f1', 0):.3f}",
+        f"   📊 Semantic Similarity: {test_results.get('average_semantic_similarity', 0):.3f}",
+    ]
+
+
+def _format_hallucination(test_results: Dict[str, Any]) -> List[str]:
+    return [
+        f"   📊 Hallucination Rate: {test_results.get('hallucination_rate', 0):.3f}",
+        f"   📊 Confidence: {test_results.get('average_confidence', 0):.3f}",
+    ]
+
+
+def _format_hashtag(test_results: Dict[str, Any]) -> List[str]:
+    return [
+        f"   📊 Accuracy: {test_results.get('accuracy', 0):.3f}",
+        f"   📊 Precision: {test_results.get('precision', 0):.3f}",
+        f"   📊 Recall: {test_results.get('recall', 0):.3f}",
+    ]
+
+
+def _format_sentiment(test_results: Dict[str, Any]) -> List[str]:
+    return [
+        f"   📊 Accuracy: {test_results.get('accuracy', 0):.3f}",
+        f"   📊 F1-Score: {test_results.get('f1_score', 0):.3f}",
+    ]
+
+
+def _format_ab_prompt(test_results: Dict[str, Any]) -> List[str]:
+    return [
+        f"   📊 {strategy}: Quality={metrics.get('quality', 0):.3f}"
+        for strategy, metrics in test_results.items()
+        if isinstance(metrics, dict)
+    ]
+
+
+def _format_performance(test_results: Dict[str, Any]) -> List[str]:
+    return [
+        f"   📊 Avg Response Time: {test_results.get('average_response_time', 0):.3f}s",
+        f"   📊 Memory Usage: {test_results.get('peak_memory_mb', 0):.1f}MB",
+    ]
+
+
+# Строки метрик для итогового отчета по имени теста
+_SUMMARY_FORMATTERS: Dict[str, Callable[[Dict[str, Any]], List[str]]] = {
+    "rouge": _format_rouge,
+    "semantic": _format_semantic,
+    "hallucination": _format_hallucination,
+    "hashtag": _format_hashtag,
+    "sentiment": _format_sentiment,
+    "ab_prompt": _format_ab_prompt,
+    "performance": _format_performance,
+}
+
 
 class UnifiedTestRunner:
     """Унифицированный раннер для всех тестов оценки"""
@@ -79,7 +152,10 @@ class UnifiedTestRunner:
             return None
 
     async def run_test(
-        self, test_name: str, samples: int = 100
+        self,
+        test_name: str,
+        samples: int = 100,
+        db_config: Optional[Dict[str, Any]] = None,
     ) -> Optional[Dict[str, Any]]:
         """Запуск отдельного теста"""
         if test_name not in self.test_registry:
@@ -92,25 +168,30 @@ class UnifiedTestRunner:
             # Создаем экземпляр тестера
             test_class = self.test_registry[test_name]
 
-            # Всегда используем db_config
-            db_config = self.load_db_config()
+            # Всегда используем db_config (при прогоне нескольких тестов
+            # он загружается один раз и передается сюда)
+            if db_config is None:
+                db_config = self.load_db_config()
             if db_config is None:
                 logger.error(
                     f"Не удалось загрузить конфигурацию БД для теста {test_name}"
                 )
                 return None
-            evaluator = test_class(db_config)
+            # Загрузка моделей и сам расчет — синхронные и тяжелые: выполняем
+            # в потоке (torch/numpy/tokenizers отпускают GIL), чтобы не держать
+            # event loop и позволить независимым тестам идти параллельно
+            evaluator = await asyncio.to_thread(test_class, db_config)
 
             # Запуск теста
-            start_time = time.time()
+            start_time = time.perf_counter()
 
             # Получаем данные для теста
             test_data = await evaluator.fetch_test_data(samples)
 
             # Все тесты используют метод run_test
-            results = evaluator.run_test(test_data)
+            results = await asyncio.to_thread(evaluator.run_test, test_data)
 
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
 
             logger.info(f"✅ Тест {test_name} завершен за {execution_time:.2f}s")
 
@@ -126,22 +207,41 @@ class UnifiedTestRunner:
             return None
 
     async def run_multiple_tests(
-        self, test_names: List[str], samples: int = 100
+        self, test_names: List[str], samples: int = 100, concurrency: int = 3
     ) -> Dict[str, Any]:
-        """Запуск нескольких тестов"""
+        """Запуск нескольких тестов (до concurrency одновременно)"""
         logger.info(f"📊 Запуск {len(test_names)} тестов: {', '.join(test_names)}")
 
         all_results = {}
-        total_start_time = time.time()
+        total_start_time = time.perf_counter()
+        # Конфигурация БД одна на весь прогон — читаем файл один раз
+        db_config = self.load_db_config()
 
-        for test_name in test_names:
-            result = await self.run_test(test_name, samples)
-            if result:
-                all_results[test_name] = result
-            else:
-                logger.warning(f"⚠️ Тест {test_name} не выполнен")
+        # Тесты независимы: запускаем их параллельно, а семафор ограничивает
+        # нагрузку на общий пул соединений и память под модели
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run_bounded(test_name: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.run_test(test_name, samples, db_config)
 
-        total_execution_time = time.time() - total_start_time
+        try:
+            results = await asyncio.gather(
+                *(run_bounded(test_name) for test_name in test_names),
+                return_exceptions=True,
+            )
+            for test_name, result in zip(test_names, results):
+                if isinstance(result, Exception):
+                    logger.error(f"❌ Ошибка в тесте {test_name}: {result}")
+                elif result:
+                    all_results[test_name] = result
+                else:
+                    logger.warning(f"⚠️ Тест {test_name} не выполнен")
+        finally:
+            # Пул соединений общий для всех тестов прогона
+            await BaseEvaluator.close_pools()
+
+        total_execution_time = time.perf_counter() - total_start_time
 
         # Формируем итоговый отчет
         summary = {
@@ -163,83 +263,49 @@ class UnifiedTestRunner:
             output_file = f"evaluation/test_results_{timestamp}.json"
 
         try:
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+            # Сериализуем целиком и отдаем одним write()
+            payload = dumps_report(results)
+            # Пишем во временный файл рядом и атомарно подменяем: при сбое
+            # посреди записи на месте остается прежний файл, а не обрывок
+            tmp_file = f"{output_file}.tmp"
+            with open(tmp_file, "wb", buffering=1 << 16) as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, output_file)
             logger.info(f"📄 Результаты сохранены в {output_file}")
         except Exception as e:
             logger.error(f"Ошибка сохранения результатов: {e}")
 
     def print_summary(self, results: Dict[str, Any]):
         """Вывод краткого отчета"""
-        print("\n" + "=" * 80)
-        print("🎯 ИТОГОВЫЙ ОТЧЕТ ПО ТЕСТИРОВАНИЮ")
-        print("=" * 80)
+        # Собираем строки отчета и выводим их одним print
+        lines = [
+            "\n" + _RULE,
+            "🎯 ИТОГОВЫЙ ОТЧЕТ ПО ТЕСТИРОВАНИЮ",
+            _RULE,
+            f"⏰ Время выполнения: {results['timestamp']}",
+            f"📊 Всего тестов: {results['total_tests']}",
+            f"✅ Успешных: {results['successful_tests']}",
+            f"❌ Неудачных: {results['failed_tests']}",
+            f"⏱️ Общее время: {results['total_execution_time']:.2f}s",
+            f"🔢 Образцов на тест: {results['samples_per_test']}",
+            "\n📈 РЕЗУЛЬТАТЫ ПО ТЕСТАМ:",
+            _DIVIDER,
+        ]
+        add = lines.append
 
-        print(f"⏰ Время выполнения: {results['timestamp']}")
-        print(f"📊 Всего тестов: {results['total_tests']}")
-        print(f"✅ Успешных: {results['successful_tests']}")
-        print(f"❌ Неудачных: {results['failed_tests']}")
-        print(f"⏱️ Общее время: {results['total_execution_time']:.2f}s")
-        print(f"🔢 Образцов на тест: {results['samples_per_test']}")
+        for test_name, test_data in results["results"].items():
+            add(f"\n🧪 {test_name.upper()}:")
+            add(f"   ⏱️ Время: {test_data['execution_time']:.2f}s")
 
-        print("\n📈 РЕЗУЛЬТАТЫ ПО ТЕСТАМ:")
-        print("-" * 50)
+            # Формат строк метрик зависит от теста — выбираем по таблице
+            formatter = _SUMMARY_FORMATTERS.get(test_name)
+            if formatter and test_data.get("results"):
+                lines.extend(formatter(test_data["results"]))
 
-        for test_name, test_data in results["results"].items():
-            print(f"\n🧪 {test_name.upper()}:")
-            print(f"   ⏱️ Время: {test_data['execution_time']:.2f}s")
-
-            if "results" in test_data and test_data["results"]:
-                test_results = test_data["results"]
-
-                # Разные форматы для разных тестов
-                if test_name == "rouge":
-                    avg_rouge = test_results.get("average_rouge_scores", {})
-                    print(f"   📊 ROUGE-1: {avg_rouge.get('rouge1_f', 0):.3f}")
-                    print(f"   📊 ROUGE-2: {avg_rouge.get('rouge2_f', 0):.3f}")
-                    print(f"   📊 ROUGE-L: {avg_rouge.get('rougeL_f', 0):.3f}")
-
-                elif test_name == "semantic":
-                    print(
-                        f"   📊 BERTScore F1: {test_results.get('average_bertscore_f1', 0):.3f}"
-                    )
-                    print(
-                        f"   📊 Semantic Similarity: {test_results.get('average_semantic_similarity', 0):.3f}"
-                    )
-
-                elif test_name == "hallucination":
-                    print(
-                        f"   📊 Hallucination Rate: {test_results.get('hallucination_rate', 0):.3f}"
-                    )
-                    print(
-                        f"   📊 Confidence: {test_results.get('average_confidence', 0):.3f}"
-                    )
-
-                elif test_name == "hashtag":
-                    print(f"   📊 Accuracy: {test_results.get('accuracy', 0):.3f}")
-                    print(f"   📊 Precision: {test_results.get('precision', 0):.3f}")
-                    print(f"   📊 Recall: {test_results.get('recall', 0):.3f}")
-
-                elif test_name == "sentiment":
-                    print(f"   📊 Accuracy: {test_results.get('accuracy', 0):.3f}")
-                    print(f"   📊 F1-Score: {test_results.get('f1_score', 0):.3f}")
-
-                elif test_name == "ab_prompt":
-                    for strategy, metrics in test_results.items():
-                        if isinstance(metrics, dict):
-                            print(
-                                f"   📊 {strategy}: Quality={metrics.get('quality', 0):.3f}"
-                            )
-
-                elif test_name == "performance":
-                    print(
-                        f"   📊 Avg Response Time: {test_results.get('average_response_time', 0):.3f}s"
-                    )
-                    print(
-                        f"   📊 Memory Usage: {test_results.get('peak_memory_mb', 0):.1f}MB"
-                    )
-
-        print("\n" + "=" * 80)
+        add("\n" + _RULE)
+        print("\n".join(lines))
 
 
 def main():
@@ -286,6 +352,13 @@ def main():
         "--no-save", action="store_true", help="Do not save results to file"
     )
 
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=3,
+        help="Max number of tests running at the same time (default: 3)",
+    )
+
     args = parser.parse_args()
 
     # Определяем какие тесты запускать
@@ -312,7 +385,9 @@ def main():
     runner = UnifiedTestRunner(args.db_config)
 
     async def run_tests():
-        results = await runner.run_multiple_tests(test_names, args.samples)
+        results = await runner.run_multiple_tests(
+            test_names, args.samples, args.concurrency
+        )
 
         # Выводим отчет
         runner.print_summary(results)
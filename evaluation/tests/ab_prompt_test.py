@@ -5,7 +5,6 @@
 
 from typing import List, Dict, Any
 import numpy as np
-import random
 from .base_evaluator import BaseEvaluator
 
 
@@ -14,6 +13,8 @@ class ABPromptTest(BaseEvaluator):
 
     def __init__(self, db_config: dict = None):
         super().__init__(db_config)
+        # Собственный генератор (PCG64) вместо глобального random
+        self.rng = np.random.default_rng()
         self.prompt_variants = self._define_prompt_variants()
 
     def _define_prompt_variants(self) -> List[Dict[str, Any]]:
@@ -57,37 +58,38 @@ class ABPromptTest(BaseEvaluator):
         """Запуск A/B тестирования промптов."""
         print("🔍 Запуск A/B тестирования промптов...")
 
-        # Симулируем тестирование разных промптов
-        variant_results = {}
-
-        for variant in self.prompt_variants:
-            variant_name = variant["name"]
-            print(f"  🧪 Тестирование варианта: {variant_name}")
-
+        # Симулируем тестирование разных промптов: оценки вариантов — в массив
+        samples_tested = min(len(data), 10)
+        quality_scores = np.empty(len(self.prompt_variants), dtype=np.float64)
+        for i, variant in enumerate(self.prompt_variants):
+            print(f"  🧪 Тестирование варианта: {variant['name']}")
             # Симулируем анализ с данным промптом
-            quality_score = self._simulate_prompt_quality(variant, data[:10])
+            quality_scores[i] = self._simulate_prompt_quality(variant, data[:10])
 
-            variant_results[variant_name] = {
+        variant_results = {
+            variant["name"]: {
                 "description": variant["description"],
-                "quality_score": quality_score,
+                "quality_score": score,
                 "temperature": variant["temperature"],
-                "samples_tested": min(len(data), 10),
+                "samples_tested": samples_tested,
             }
+            for variant, score in zip(self.prompt_variants, quality_scores.tolist())
+        }
 
-        # Определяем лучший вариант
-        best_variant = max(
-            variant_results.keys(), key=lambda x: variant_results[x]["quality_score"]
-        )
+        # Лучший вариант — argmax по массиву оценок
+        best_idx = int(quality_scores.argmax())
+        best_variant = self.prompt_variants[best_idx]["name"]
+        best_score = float(quality_scores[best_idx])
 
         self.results["metrics"] = {
             "variants_tested": len(variant_results),
             "best_variant": best_variant,
-            "best_score": variant_results[best_variant]["quality_score"],
+            "best_score": best_score,
             "variant_results": variant_results,
         }
 
         self.results["details"] = {
-            "samples_processed": min(len(data), 10),
+            "samples_processed": samples_tested,
             "variants": variant_results,
         }
 
@@ -114,7 +116,7 @@ class ABPromptTest(BaseEvaluator):
             base_score -= 0.05
 
         # Добавляем случайную вариацию
-        variation = random.uniform(-0.1, 0.1)
+        variation = self.rng.uniform(-0.1, 0.1)
         final_score = max(0.0, min(1.0, base_score + variation))
 
         return round(final_score, 3)
@@ -163,16 +165,16 @@ class ABPromptTest(BaseEvaluator):
                 )
 
         # Рекомендации по temperature
-        for variant_name, result in variant_results.items():
-            if result["quality_score"] == best_score:
-                temp = result["temperature"]
-                if temp <= 0.3:
-                    recommendations.append(
-                        "Низкая температура дает хорошие результаты - модель стабильна"
-                    )
-                elif temp >= 0.7:
-                    recommendations.append(
-                        "Высокая температура работает хорошо - модель креативна"
-                    )
+        best_result = variant_results.get(best_variant)
+        if best_result:
+            temp = best_result["temperature"]
+            if temp <= 0.3:
+                recommendations.append(
+                    "Низкая температура дает хорошие результаты - модель стабильна"
+                )
+            elif temp >= 0.7:
+                recommendations.append(
+                    "Высокая температура работает хорошо - модель креативна"
+                )
 
         return recommendations
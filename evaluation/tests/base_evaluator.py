@@ -4,6 +4,7 @@
 """
 
 import asyncio
+import json
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
@@ -11,10 +12,74 @@ import asyncpg
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+    _json_loads = orjson.loads
+except ImportError:
+    ORJSON_AVAILABLE = False
+    _json_loads = json.loads
+
+
+def json_default(obj: Any) -> Any:
+    """Сериализация numpy-скаляров и массивов для stdlib json (default=)."""
+    # У numpy-скаляров и ndarray есть tolist(): скаляр -> число, массив -> список
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_report(obj: Any) -> bytes:
+    """Сериализация отчета в UTF-8 JSON с отступами (orjson, если доступен)."""
+    if ORJSON_AVAILABLE:
+        # orjson сразу выдает байты и сам сериализует numpy-скаляры
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_INDENT_2
+            | orjson.OPT_SERIALIZE_NUMPY
+            | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=json_default).encode(
+        "utf-8"
+    )
+
+
+class RunningStats:
+    """Онлайн mean/std/min/max (алгоритм Уэлфорда) без хранения выборки."""
+
+    __slots__ = ("n", "mean", "m2", "lo", "hi")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.lo = float("inf")
+        self.hi = float("-inf")
+
+    def push(self, x: float):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        if x < self.lo:
+            self.lo = x
+        if x > self.hi:
+            self.hi = x
+
+    @property
+    def std(self) -> float:
+        """Стандартное отклонение по генеральной совокупности (как np.std)."""
+        return (self.m2 / self.n) ** 0.5 if self.n else 0.0
+
 
 class BaseEvaluator:
     """Базовый класс для всех evaluation тестов."""
 
+    # Пулы соединений на процесс, по одному на конфигурацию БД:
+    # тесты одного прогона не переоткрывают подключение к PostgreSQL
+    _pools: Dict[tuple, "asyncio.Task"] = {}
+
     def __init__(self, db_config: dict = None):
         self.db_config = db_config or self._get_default_db_config()
         self.results = {
@@ -34,10 +99,37 @@ class BaseEvaluator:
             "password": "postgres",
         }
 
+    async def _get_pool(self) -> asyncpg.Pool:
+        """Общий пул соединений для данной конфигурации БД."""
+        key = tuple(sorted(self.db_config.items()))
+        task = BaseEvaluator._pools.get(key)
+        if task is None:
+            # Храним задачу создания: параллельные тесты дождутся одного пула
+            task = asyncio.ensure_future(
+                asyncpg.create_pool(min_size=1, max_size=4, **self.db_config)
+            )
+            BaseEvaluator._pools[key] = task
+        try:
+            return await task
+        except Exception:
+            BaseEvaluator._pools.pop(key, None)
+            raise
+
+    @classmethod
+    async def close_pools(cls):
+        """Закрытие всех пулов соединений (в конце прогона)."""
+        tasks, cls._pools = list(cls._pools.values()), {}
+        for task in tasks:
+            try:
+                pool = await task
+            except Exception:
+                continue
+            await pool.close()
+
     async def fetch_test_data(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Получение тестовых данных из PostgreSQL."""
         try:
-            conn = await asyncpg.connect(**self.db_config)
+            pool = await self._get_pool()
 
             query = """
             SELECT 
@@ -57,32 +149,12 @@ class BaseEvaluator:
             LIMIT $1
             """
 
-            rows = await conn.fetch(query, limit)
-            await conn.close()
-
             data = []
-            for row in rows:
-                hashtags = row["hashtags"] if row["hashtags"] else []
-                if isinstance(hashtags, str):
-                    import json
-
-                    try:
-                        hashtags = json.loads(hashtags)
-                    except:
-                        hashtags = hashtags.split(",") if hashtags else []
-
-                data.append(
-                    {
-                        "id": None,  # message_id не возвращаем, если нужно - добавить
-                        "channel": row["channel"],
-                        "text": row["text"],
-                        "summary": row["summary"],
-                        "sentiment": row["sentiment"],
-                        "hashtags": hashtags,
-                        "created_at": row["created_at"],
-                        "analyzed_at": row["analyzed_at"],
-                    }
-                )
+            async with pool.acquire() as conn:
+                # Курсор отдает строки порциями, без промежуточного списка Record
+                async with conn.transaction():
+                    async for record in conn.cursor(query, limit, prefetch=512):
+                        data.append(self._row_to_item(record))
 
             return data
 
@@ -90,6 +162,34 @@ class BaseEvaluator:
             print(f"❌ Ошибка при получении данных: {e}")
             return []
 
+    @staticmethod
+    def _row_to_item(record) -> Dict[str, Any]:
+        """Преобразование строки выборки в элемент тестовых данных."""
+        # Позиционная распаковка Record дешевле поиска полей по имени
+        channel, text, summary, sentiment, hashtags, created_at, analyzed_at = record
+        hashtags = hashtags if hashtags else []
+        if isinstance(hashtags, str):
+            # asyncpg отдает JSONB строкой: парсим только то, что похоже на массив,
+            # CSV-строки режем сразу без исключения на каждой строке
+            if hashtags.startswith("["):
+                try:
+                    hashtags = _json_loads(hashtags)
+                except json.JSONDecodeError:
+                    hashtags = hashtags.split(",")
+            else:
+                hashtags = hashtags.split(",")
+
+        return {
+            "id": None,  # message_id не возвращаем, если нужно - добавить
+            "channel": channel,
+            "text": text,
+            "summary": summary,
+            "sentiment": sentiment,
+            "hashtags": hashtags,
+            "created_at": created_at,
+            "analyzed_at": analyzed_at,
+        }
+
     def run_test(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Основной метод для запуска теста.
@@ -117,12 +217,11 @@ class BaseEvaluator:
 
     def save_results(self, output_path: str):
         """Сохранение результатов в файл."""
-        import json
-
         path = Path(output_path)
         path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.generate_report(), f, ensure_ascii=False, indent=2)
+        report = self.generate_report()
+        with open(path, "wb") as f:
+            f.write(dumps_report(report))
 
         print(f"✅ Результаты сохранены: {path}")
@@ -3,19 +3,55 @@
 Тест детекции галлюцинаций в суммаризации.
 """
 
-from typing import List, Dict, Any
+import hashlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Tuple
 import numpy as np
 import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from .base_evaluator import BaseEvaluator
 
+# Intel Extension for PyTorch — опционально, ускоряет CPU-инференс
+try:
+    import intel_extension_for_pytorch as ipex
+
+    IPEX_AVAILABLE = True
+except ImportError:
+    ipex = None
+    IPEX_AVAILABLE = False
+
+# Максимум закэшированных оценок entailment
+NLI_CACHE_SIZE = 50_000
+# Размер батча NLI (им же прогревается скомпилированная модель)
+NLI_BATCH_SIZE = 32
+# Предел длины пары в токенах — один для eager и скомпилированной модели
+NLI_MAX_LENGTH = 512
+# Шаг корзин длины для скомпилированной модели: 128/256/384/512 токенов,
+# по одному CUDA graph на корзину
+NLI_LENGTH_STEP = 128
+
+# Пороги entailment, ниже которых саммари считается галлюцинацией
+HALLUCINATION_THRESHOLDS = (0.3, 0.5, 0.7)
+# Ключи метрик по порогам строим один раз при импорте
+_RATE_KEYS = tuple(
+    f"hallucination_rate_threshold_{threshold}"
+    for threshold in HALLUCINATION_THRESHOLDS
+)
+_RATE_KEY_05 = "hallucination_rate_threshold_0.5"
+
+
+def _normalize(text: str) -> str:
+    """Схлопывание пробелов и нижний регистр для сравнения фрагментов."""
+    return " ".join(text.split()).lower()
+
 
 class HallucinationTest(BaseEvaluator):
     """Тест детекции галлюцинаций."""
 
     def __init__(self, db_config: dict = None):
         super().__init__(db_config)
-        self.hallucination_thresholds = [0.3, 0.5, 0.7]
+        self.hallucination_thresholds = list(HALLUCINATION_THRESHOLDS)
+        self._nli_cache: "OrderedDict[str, float]" = OrderedDict()
         self._load_nli_model()
 
     def _load_nli_model(self):
@@ -24,30 +60,78 @@ class HallucinationTest(BaseEvaluator):
             print("🔄 Загрузка NLI модели для детекции галлюцинаций...")
             model_name = "cointegrated/rubert-base-cased-nli-threeway"
 
-            self.nli_tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.nli_tokenizer = AutoTokenizer.from_pretrained(
+                model_name, use_fast=True
+            )
             self.nli_model = AutoModelForSequenceClassification.from_pretrained(
                 model_name
             )
 
-            # Создаем pipeline для удобства
-            self.nli_pipeline = pipeline(
-                "text-classification",
-                model=self.nli_model,
-                tokenizer=self.nli_tokenizer,
-                device=0 if torch.cuda.is_available() else -1,
+            # Индекс класса entailment в выходе модели
+            self.entailment_idx = next(
+                idx
+                for idx, label in self.nli_model.config.id2label.items()
+                if "entailment" in label.lower()
             )
 
+            # По умолчанию паддинг до самой длинной пары в батче
+            self.padding_kwargs = {"padding": True, "max_length": NLI_MAX_LENGTH}
+            # Дополнять ли неполный батч до NLI_BATCH_SIZE (нужно для CUDA graphs)
+            self.fixed_batch_size = False
+
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            self.nli_model.to(self.device).eval()
+            if self.device.type == "cuda":
+                # fp16 на GPU: вдвое меньше трафика по памяти и tensor cores
+                self.nli_model.half()
+
+                # Слияние операторов и CUDA graphs; при ошибке остаемся в eager
+                if hasattr(torch, "compile"):
+                    self._try_compile_nli_model()
+            elif IPEX_AVAILABLE:
+                # Слияние Linear+GELU/Add и attention-паттернов BERT на CPU
+                self.nli_model = ipex.optimize(self.nli_model)
+
             print("✅ NLI модель загружена")
         except Exception as e:
             print(f"❌ Ошибка загрузки NLI модели: {e}")
             self.nli_model = None
-            self.nli_pipeline = None
+
+    def _try_compile_nli_model(self):
+        """torch.compile с прогревом; при любой ошибке — eager-модель."""
+        # CUDA graphs переиспользуются только при стабильной форме входа:
+        # длину округляем вверх до корзины, предел тот же, что в eager
+        bucket_padding = {**self.padding_kwargs, "pad_to_multiple_of": NLI_LENGTH_STEP}
+        try:
+            # dynamic=False: на каждую корзину — свой статический граф
+            compiled = torch.compile(
+                self.nli_model, mode="reduce-overhead", dynamic=False
+            )
+            # Компиляция ленивая: ошибки Inductor/Triton всплывают только
+            # на первом forward, поэтому прогоняем здесь все рабочие формы
+            for length in range(NLI_LENGTH_STEP, NLI_MAX_LENGTH + 1, NLI_LENGTH_STEP):
+                dummy = self.nli_tokenizer(
+                    ["."] * NLI_BATCH_SIZE,
+                    ["."] * NLI_BATCH_SIZE,
+                    padding="max_length",
+                    max_length=length,
+                    return_tensors="pt",
+                ).to(self.device)
+                with torch.inference_mode():
+                    compiled(**dummy)
+        except Exception as e:
+            print(f"⚠️ torch.compile недоступен, eager-режим: {e}")
+            return
+
+        self.nli_model = compiled
+        self.padding_kwargs = bucket_padding
+        self.fixed_batch_size = True
 
     def run_test(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Запуск тестов детекции галлюцинаций."""
         print("🔍 Запуск детекции галлюцинаций...")
 
-        if not self.nli_pipeline:
+        if not self.nli_model:
             print("❌ NLI модель недоступна")
             return self.results
 
@@ -70,84 +154,147 @@ class HallucinationTest(BaseEvaluator):
         self, texts: List[str], summaries: List[str]
     ) -> Dict[str, Any]:
         """Анализ галлюцинаций в суммаризации."""
-        entailment_scores = []
-        hallucination_counts = {
-            threshold: 0 for threshold in self.hallucination_thresholds
-        }
-
-        for text, summary in zip(texts, summaries):
-            if not text or not summary:
-                continue
-
-            # Получаем оценку entailment
-            entailment_score = self._get_entailment_score(text, summary)
-            entailment_scores.append(entailment_score)
-
-            # Проверяем по разным порогам
-            for threshold in self.hallucination_thresholds:
-                if entailment_score < threshold:
-                    hallucination_counts[threshold] += 1
-
-        total_samples = len(entailment_scores)
-
-        results = {
-            "entailment_score_mean": (
-                np.mean(entailment_scores) if entailment_scores else 0.0
-            ),
-            "entailment_score_std": (
-                np.std(entailment_scores) if entailment_scores else 0.0
-            ),
-            "entailment_score_min": (
-                np.min(entailment_scores) if entailment_scores else 0.0
-            ),
-            "entailment_score_max": (
-                np.max(entailment_scores) if entailment_scores else 0.0
-            ),
-        }
+        pairs = [
+            (text, summary)
+            for text, summary in zip(texts, summaries)
+            if text and summary
+        ]
+
+        # Оценки entailment считаем батчами, а не по одной паре
+        scores = self._get_entailment_scores_batched(pairs)
+
+        if not scores.size:
+            results = {
+                "entailment_score_mean": 0.0,
+                "entailment_score_std": 0.0,
+                "entailment_score_min": 0.0,
+                "entailment_score_max": 0.0,
+            }
+            rates = [0] * len(_RATE_KEYS)
+        else:
+            results = {
+                "entailment_score_mean": float(scores.mean(dtype=np.float64)),
+                "entailment_score_std": float(scores.std(dtype=np.float64)),
+                "entailment_score_min": float(scores.min()),
+                "entailment_score_max": float(scores.max()),
+            }
+            # Доли ниже каждого порога одной векторной операцией
+            thresholds = np.asarray(HALLUCINATION_THRESHOLDS)
+            rates = (scores[None, :] < thresholds[:, None]).mean(axis=1).tolist()
 
         # Добавляем показатели галлюцинаций по порогам
-        for threshold in self.hallucination_thresholds:
-            hallucination_rate = (
-                hallucination_counts[threshold] / total_samples
-                if total_samples > 0
-                else 0
-            )
-            results[f"hallucination_rate_threshold_{threshold}"] = hallucination_rate
+        results.update(zip(_RATE_KEYS, rates))
 
         return results
 
-    def _get_entailment_score(self, premise: str, hypothesis: str) -> float:
-        """Получение оценки entailment между текстом и суммари."""
-        try:
-            # Обрезаем тексты до разумной длины
-            premise = premise[:512]
-            hypothesis = hypothesis[:256]
-
-            # Форматируем для NLI модели
-            input_text = f"{premise} [SEP] {hypothesis}"
-
-            # Получаем предсказание
-            result = self.nli_pipeline(input_text)
-
-            # Ищем класс entailment
-            entailment_score = 0.0
-            for prediction in result:
-                if "entailment" in prediction["label"].lower():
-                    entailment_score = prediction["score"]
-                    break
+    def _get_entailment_scores_batched(
+        self, pairs: List[Tuple[str, str]], batch_size: int = NLI_BATCH_SIZE
+    ) -> np.ndarray:
+        """Оценки entailment для пар (текст, суммари) батчами, с LRU-кэшем."""
+        scores = np.zeros(len(pairs), dtype=np.float32)
+
+        # Обрезаем тексты до разумной длины
+        pairs = [(premise[:512], hypothesis[:256]) for premise, hypothesis in pairs]
+
+        # Повторы (например, репосты между каналами) считаем один раз
+        pending: Dict[str, List[int]] = {}
+        extractive = 0
+        # Методы, вызываемые на каждой паре, — в локальные имена
+        blake2b = hashlib.blake2b
+        cache_get = self._nli_cache.get
+        cache_touch = self._nli_cache.move_to_end
+        pending_add = pending.setdefault
+        for i, (premise, hypothesis) in enumerate(pairs):
+            # Дешевый фильтр до NLI: дословный фрагмент текста (с точностью до
+            # пробелов и регистра) следует из него по определению. Пустая
+            # строка входит в любую, поэтому пустое суммари идет в NLI
+            norm_hypothesis = _normalize(hypothesis)
+            if norm_hypothesis and norm_hypothesis in _normalize(premise):
+                scores[i] = 1.0
+                extractive += 1
+                continue
 
-            return float(entailment_score)
+            key = blake2b(
+                f"{premise}||{hypothesis}".encode("utf-8"), digest_size=16
+            ).hexdigest()
+            cached = cache_get(key)
+            if cached is not None:
+                cache_touch(key)
+                scores[i] = cached
+            else:
+                pending_add(key, []).append(i)
+
+        # Сортируем по длине: в батч попадают пары близкой длины, меньше паддинга.
+        # Результаты раскладываются по сохраненным индексам, порядок не важен
+        misses = sorted(
+            pending.items(),
+            key=lambda item: len(pairs[item[1][0]][0]) + len(pairs[item[1][0]][1]),
+        )
+        if extractive:
+            print(f"  ⏭️ Извлекающих саммари без NLI: {extractive}")
+
+        # Длины пар в токенах (без паддинга) — для сводки после прогона
+        token_lengths = []
+        for start in range(0, len(misses), batch_size):
+            batch = misses[start : start + batch_size]
+            try:
+                premises = [pairs[idxs[0]][0] for _, idxs in batch]
+                hypotheses = [pairs[idxs[0]][1] for _, idxs in batch]
+                if self.fixed_batch_size and len(batch) < batch_size:
+                    # Хвост дополняем копиями последней пары, чтобы форма батча
+                    # не менялась
+                    fill = batch_size - len(batch)
+                    premises += premises[-1:] * fill
+                    hypotheses += hypotheses[-1:] * fill
+
+                encoded = self.nli_tokenizer(
+                    premises,
+                    hypotheses,
+                    # Обрезаем только текст-посылку, суммари сохраняем целиком
+                    truncation="only_first",
+                    return_tensors="pt",
+                    **self.padding_kwargs,
+                )
+                # Длины считаем на CPU, до копирования на устройство
+                token_lengths.extend(
+                    encoded["attention_mask"][: len(batch)].sum(dim=1).tolist()
+                )
+                encoded = encoded.to(self.device, non_blocking=True)
+
+                with torch.inference_mode():
+                    logits = self.nli_model(**encoded).logits
+
+                # softmax в fp32, чтобы не терять точность при fp16-логитах;
+                # строки-заполнители хвоста отбрасываем
+                probs = torch.softmax(logits.float(), dim=-1)
+                probs = probs[: len(batch), self.entailment_idx]
+
+                for (key, idxs), score in zip(batch, probs.cpu().tolist()):
+                    scores[idxs] = score
+                    self._nli_cache[key] = score
+                    if len(self._nli_cache) > NLI_CACHE_SIZE:
+                        self._nli_cache.popitem(last=False)
+
+            except Exception as e:
+                print(f"❌ Ошибка в _get_entailment_scores_batched: {e}")
+
+        if token_lengths:
+            lengths = np.asarray(token_lengths)
+            p50, p95 = np.percentile(lengths, (50, 95)).tolist()
+            print(
+                f"  📏 Длина пар в токенах: p50={p50:.0f}, p95={p95:.0f}, "
+                f"max={lengths.max()}, "
+                f"обрезано до {NLI_MAX_LENGTH}: {(lengths >= NLI_MAX_LENGTH).sum()}"
+            )
 
-        except Exception as e:
-            print(f"❌ Ошибка в _get_entailment_score: {e}")
-            return 0.0
+        return scores
 
     def _generate_summary(self) -> str:
         """Генерация краткого резюме теста галлюцинаций."""
         metrics = self.results["metrics"]
 
         entailment_mean = metrics.get("entailment_score_mean", 0)
-        hallucination_rate_05 = metrics.get("hallucination_rate_threshold_0.5", 0)
+        hallucination_rate_05 = metrics.get(_RATE_KEY_05, 0)
 
         return f"Entailment: {entailment_mean:.3f}, Hallucination Rate (0.5): {hallucination_rate_05:.3f}"
 
@@ -157,7 +304,7 @@ class HallucinationTest(BaseEvaluator):
         recommendations = []
 
         entailment_mean = metrics.get("entailment_score_mean", 0)
-        hallucination_rate_05 = metrics.get("hallucination_rate_threshold_0.5", 0)
+        hallucination_rate_05 = metrics.get(_RATE_KEY_05, 0)
 
         if entailment_mean < 0.6:
             recommendations.append(
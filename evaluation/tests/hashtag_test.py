@@ -3,9 +3,10 @@
 Тест качества хештегов: релевантность и разнообразие.
 """
 
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Set, Tuple
 import numpy as np
 from collections import Counter
+from statistics import fmean
 from sentence_transformers import SentenceTransformer
 from .base_evaluator import BaseEvaluator
 
@@ -15,6 +16,9 @@ class HashtagTest(BaseEvaluator):
 
     def __init__(self, db_config: dict = None):
         super().__init__(db_config)
+        # Словарь хештегов мал и сильно повторяется между текстами —
+        # кешируем embedding и его норму по тексту хештега
+        self._tag_embeddings: Dict[str, Tuple[np.ndarray, float]] = {}
         self._load_models()
 
     def _load_models(self):
@@ -44,9 +48,7 @@ class HashtagTest(BaseEvaluator):
         self.results["details"] = {
             "samples_processed": len(data),
             "total_unique_hashtags": len(self._get_all_hashtags(hashtags_lists)),
-            "average_hashtags_per_text": np.mean(
-                [len(tags) for tags in hashtags_lists if tags]
-            ),
+            "average_hashtags_per_text": self._average_hashtag_count(hashtags_lists),
         }
 
         return self.results
@@ -55,42 +57,40 @@ class HashtagTest(BaseEvaluator):
         self, texts: List[str], hashtags_lists: List[List[str]]
     ) -> Dict[str, float]:
         """Анализ качества хештегов."""
-        relevance_scores = []
-        diversity_scores = []
-        coverage_scores = []
+        # Строки: (relevance, diversity, coverage) на каждый пример, float32
+        scores = np.empty((len(texts), 3), dtype=np.float32)
+        count = 0
 
         for text, hashtags in zip(texts, hashtags_lists):
             if not text or not hashtags:
                 continue
 
-            # Релевантность хештегов к тексту
-            relevance = self._compute_hashtag_relevance(text, hashtags)
-            relevance_scores.append(relevance)
-
-            # Разнообразие хештегов
-            diversity = self._compute_hashtag_diversity(hashtags)
-            diversity_scores.append(diversity)
+            scores[count] = (
+                # Релевантность хештегов к тексту
+                self._compute_hashtag_relevance(text, hashtags),
+                # Разнообразие хештегов
+                self._compute_hashtag_diversity(hashtags),
+                # Покрытие ключевых тем
+                self._compute_topic_coverage(text, hashtags),
+            )
+            count += 1
 
-            # Покрытие ключевых тем
-            coverage = self._compute_topic_coverage(text, hashtags)
-            coverage_scores.append(coverage)
+        if count:
+            scores = scores[:count]
+            # Накопление в float64, хранение — в float32
+            means = scores.mean(axis=0, dtype=np.float64).tolist()
+            stds = scores.std(axis=0, dtype=np.float64).tolist()
+        else:
+            means = stds = [0.0, 0.0, 0.0]
 
         return {
-            "hashtag_relevance_mean": (
-                np.mean(relevance_scores) if relevance_scores else 0.0
-            ),
-            "hashtag_relevance_std": (
-                np.std(relevance_scores) if relevance_scores else 0.0
-            ),
-            "hashtag_diversity_mean": (
-                np.mean(diversity_scores) if diversity_scores else 0.0
-            ),
-            "hashtag_diversity_std": (
-                np.std(diversity_scores) if diversity_scores else 0.0
-            ),
-            "topic_coverage_mean": np.mean(coverage_scores) if coverage_scores else 0.0,
-            "topic_coverage_std": np.std(coverage_scores) if coverage_scores else 0.0,
-            "samples_with_hashtags": len(relevance_scores),
+            "hashtag_relevance_mean": means[0],
+            "hashtag_relevance_std": stds[0],
+            "hashtag_diversity_mean": means[1],
+            "hashtag_diversity_std": stds[1],
+            "topic_coverage_mean": means[2],
+            "topic_coverage_std": stds[2],
+            "samples_with_hashtags": count,
         }
 
     def _compute_hashtag_relevance(self, text: str, hashtags: List[str]) -> float:
@@ -102,19 +102,26 @@ class HashtagTest(BaseEvaluator):
             # Получаем embedding текста
             text_embedding = self.sentence_model.encode([text[:500]])[0]
 
-            # Получаем embeddings хештегов
-            hashtag_texts = [f"#{tag}" for tag in hashtags]
-            hashtag_embeddings = self.sentence_model.encode(hashtag_texts)
+            # Получаем embeddings хештегов (кодируем только новые)
+            cache = self._tag_embeddings
+            missing = list(dict.fromkeys(tag for tag in hashtags if tag not in cache))
+            if missing:
+                embeddings = self.sentence_model.encode([f"#{tag}" for tag in missing])
+                for tag, emb in zip(missing, embeddings):
+                    cache[tag] = (emb, float(np.linalg.norm(emb)))
 
             # Вычисляем среднее косинусное сходство
+            text_norm = np.linalg.norm(text_embedding)
             similarities = []
-            for hashtag_emb in hashtag_embeddings:
+            for tag in hashtags:
+                hashtag_emb, hashtag_norm = cache[tag]
                 similarity = np.dot(text_embedding, hashtag_emb) / (
-                    np.linalg.norm(text_embedding) * np.linalg.norm(hashtag_emb)
+                    text_norm * hashtag_norm
                 )
                 similarities.append(float(similarity))
 
-            return np.mean(similarities) if similarities else 0.0
+            # Несколько чисел — fmean дешевле вызова np.mean
+            return fmean(similarities) if similarities else 0.0
 
         except Exception as e:
             print(f"❌ Ошибка в _compute_hashtag_relevance: {e}")
@@ -130,7 +137,13 @@ class HashtagTest(BaseEvaluator):
 
         # Разнообразие длин хештегов
         lengths = [len(tag) for tag in hashtags]
-        length_std = np.std(lengths) if len(lengths) > 1 else 0
+        if len(lengths) > 1:
+            mean_length = sum(lengths) / len(lengths)
+            length_std = (
+                sum((x - mean_length) ** 2 for x in lengths) / len(lengths)
+            ) ** 0.5
+        else:
+            length_std = 0
 
         # Нормализуем std длины (максимальная полезная std ~ 5)
         normalized_length_diversity = min(length_std / 5.0, 1.0)
@@ -147,23 +160,25 @@ class HashtagTest(BaseEvaluator):
 
         # Простая эвристика: проверяем наличие ключевых слов из текста в хештегах
         text_words = set(text.lower().split())
-        hashtag_words = set()
+        if not text_words:
+            return 0.0
 
-        for tag in hashtags:
-            hashtag_words.update(tag.lower().split())
+        hashtag_words = {word for tag in hashtags for word in tag.lower().split()}
 
-        # Находим пересечение
-        common_words = text_words.intersection(hashtag_words)
+        # Пересечение множеств считается в C
+        common_count = len(text_words & hashtag_words)
 
         # Вычисляем покрытие
-        if len(text_words) == 0:
-            return 0.0
-
-        coverage = len(common_words) / min(
-            len(text_words), 20
-        )  # Ограничиваем до 20 слов
+        coverage = common_count / min(len(text_words), 20)  # Ограничиваем до 20 слов
         return min(coverage, 1.0)
 
+    @staticmethod
+    def _average_hashtag_count(hashtags_lists: List[List[str]]) -> float:
+        """Среднее число хештегов на текст (без пустых списков)."""
+        counts = [len(tags) for tags in hashtags_lists if tags]
+        # fmean без накладных расходов на ndarray и без nan на пустом входе
+        return fmean(counts) if counts else 0.0
+
     def _get_all_hashtags(self, hashtags_lists: List[List[str]]) -> Set[str]:
         """Получение всех уникальных хештегов."""
         all_hashtags = set()
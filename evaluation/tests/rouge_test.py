@@ -3,7 +3,7 @@
 Тест ROUGE метрик для оценки качества суммаризации.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import numpy as np
 from rouge_score import rouge_scorer
 from .base_evaluator import BaseEvaluator
@@ -22,49 +22,63 @@ class ROUGETest(BaseEvaluator):
         """Запуск ROUGE тестов."""
         print("🔍 Запуск ROUGE метрик...")
 
-        # Извлекаем тексты и саммари
-        texts = [item["text"] for item in data]
-        summaries = [item["summary"] for item in data]
+        # Один проход по данным: суммы длин и пары (эталон, саммари)
+        text_chars = summary_chars = 0
+        pairs = []
+        append = pairs.append
+        for item in data:
+            text, summary = item["text"], item["summary"]
+            text_chars += len(text)
+            summary_chars += len(summary)
+
+            # Эталон — первые 3 предложения; maxsplit не дает резать весь текст
+            reference = ". ".join(text.split(".", 3)[:3]).strip()
+            if reference and summary:
+                append((reference, summary))
 
         # Вычисляем ROUGE метрики
-        rouge_results = self._compute_rouge_scores(texts, summaries)
+        rouge_results = self._compute_rouge_scores(pairs)
 
         self.results["metrics"] = rouge_results
+        n = len(data)
         self.results["details"] = {
-            "samples_processed": len(data),
-            "average_text_length": np.mean([len(text) for text in texts]),
-            "average_summary_length": np.mean([len(summary) for summary in summaries]),
+            "samples_processed": n,
+            "average_text_length": text_chars / n if n else 0.0,
+            "average_summary_length": summary_chars / n if n else 0.0,
         }
 
         return self.results
 
-    def _compute_rouge_scores(
-        self, texts: List[str], summaries: List[str]
-    ) -> Dict[str, float]:
-        """Вычисление ROUGE метрик."""
-        rouge_1_scores = []
-        rouge_2_scores = []
-        rouge_l_scores = []
-
-        for text, summary in zip(texts, summaries):
-            # Используем первые предложения текста как эталон
-            sentences = text.split(".")[:3]  # Первые 3 предложения
-            reference = ". ".join(sentences).strip()
+    def _compute_rouge_scores(self, pairs: List[Tuple[str, str]]) -> Dict[str, float]:
+        """Вычисление ROUGE метрик для пар (эталон, саммари)."""
+        # Буфер под F-меры выделяется сразу: пара i пишет в строку i
+        scores = np.empty((len(pairs), 3), dtype=np.float32)
+        # Метод из горячего цикла — в локальное имя
+        score = self.rouge_scorer.score
+        for i, (reference, summary) in enumerate(pairs):
+            rouge = score(reference, summary)
+            scores[i] = (
+                rouge["rouge1"].fmeasure,
+                rouge["rouge2"].fmeasure,
+                rouge["rougeL"].fmeasure,
+            )
+        count = len(scores)
 
-            if reference and summary:
-                scores = self.rouge_scorer.score(reference, summary)
-                rouge_1_scores.append(scores["rouge1"].fmeasure)
-                rouge_2_scores.append(scores["rouge2"].fmeasure)
-                rouge_l_scores.append(scores["rougeL"].fmeasure)
+        if count:
+            # Среднее и std по столбцам; сумма копится в float64
+            means = scores.mean(axis=0, dtype=np.float64).tolist()
+            stds = scores.std(axis=0, dtype=np.float64).tolist()
+        else:
+            means = stds = [0.0, 0.0, 0.0]
 
         return {
-            "rouge_1_mean": np.mean(rouge_1_scores) if rouge_1_scores else 0.0,
-            "rouge_1_std": np.std(rouge_1_scores) if rouge_1_scores else 0.0,
-            "rouge_2_mean": np.mean(rouge_2_scores) if rouge_2_scores else 0.0,
-            "rouge_2_std": np.std(rouge_2_scores) if rouge_2_scores else 0.0,
-            "rouge_l_mean": np.mean(rouge_l_scores) if rouge_l_scores else 0.0,
-            "rouge_l_std": np.std(rouge_l_scores) if rouge_l_scores else 0.0,
-            "samples_count": len(rouge_1_scores),
+            "rouge_1_mean": means[0],
+            "rouge_1_std": stds[0],
+            "rouge_2_mean": means[1],
+            "rouge_2_std": stds[1],
+            "rouge_l_mean": means[2],
+            "rouge_l_std": stds[2],
+            "samples_count": count,
         }
 
     def _generate_summary(self) -> str:
@@ -7,7 +7,7 @@ from typing import List, Dict, Any
 import numpy as np
 import torch
 from sentence_transformers import SentenceTransformer
-from .base_evaluator import BaseEvaluator
+from .base_evaluator import BaseEvaluator, RunningStats
 
 # Исправленный импорт и использование bert_score
 try:
@@ -91,7 +91,7 @@ class SemanticTest(BaseEvaluator):
         """Вычисление семантического сходства."""
         print("🔄 Вычисление semantic similarity...")
 
-        similarities = []
+        stats = RunningStats()
 
         if self.sentence_model is not None:
             for text, summary in zip(texts, summaries):
@@ -105,21 +105,21 @@ class SemanticTest(BaseEvaluator):
                             * np.linalg.norm(embeddings[1])
                         )
                     )
-                    similarities.append(similarity)
+                    stats.push(similarity)
+
+        if not stats.n:
+            return {
+                "semantic_similarity_mean": 0.0,
+                "semantic_similarity_std": 0.0,
+                "semantic_similarity_min": 0.0,
+                "semantic_similarity_max": 0.0,
+            }
 
         return {
-            "semantic_similarity_mean": (
-                float(np.mean(similarities)) if similarities else 0.0
-            ),
-            "semantic_similarity_std": (
-                float(np.std(similarities)) if similarities else 0.0
-            ),
-            "semantic_similarity_min": (
-                float(np.min(similarities)) if similarities else 0.0
-            ),
-            "semantic_similarity_max": (
-                float(np.max(similarities)) if similarities else 0.0
-            ),
+            "semantic_similarity_mean": stats.mean,
+            "semantic_similarity_std": stats.std,
+            "semantic_similarity_min": stats.lo,
+            "semantic_similarity_max": stats.hi,
         }
 
     def _compute_bert_scores(
@@ -139,7 +139,8 @@ class SemanticTest(BaseEvaluator):
             }
         references = []
         for text in texts:
-            sentences = text.split(".")[:3]
+            # Первые 3 предложения; maxsplit не дает резать весь текст
+            sentences = text.split(".", 3)[:3]
             reference = ". ".join(sentences).strip()
             references.append(reference if reference else text[:200])
         P, R, F1 = bert_score(summaries, references, lang="ru", verbose=False)
@@ -3,7 +3,7 @@
 Тест качества sentiment анализа: точность и консистентность.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import numpy as np
 from collections import Counter
 from .base_evaluator import BaseEvaluator
@@ -65,44 +65,51 @@ class SentimentTest(BaseEvaluator):
         self, texts: List[str], sentiments: List[str]
     ) -> Dict[str, float]:
         """Анализ качества sentiment анализа."""
-        accuracy_scores = []
-        consistency_scores = []
+        # Строки: (точность, консистентность) на каждый пример
+        scores = np.empty((len(texts), 2), dtype=np.float64)
+        count = 0
 
         for text, sentiment in zip(texts, sentiments):
             if not text or not sentiment:
                 continue
 
-            # Точность sentiment (сравнение с эвристической оценкой)
-            accuracy = self._compute_sentiment_accuracy(text, sentiment)
-            accuracy_scores.append(accuracy)
+            # Эмоциональные слова считаем один раз на текст для обеих метрик
+            counts = self._count_emotional_words(text)
+            scores[count] = (
+                # Точность sentiment (сравнение с эвристической оценкой)
+                self._compute_sentiment_accuracy(counts, sentiment),
+                # Консистентность sentiment
+                self._compute_sentiment_consistency(counts, sentiment),
+            )
+            count += 1
 
-            # Консистентность sentiment
-            consistency = self._compute_sentiment_consistency(text, sentiment)
-            consistency_scores.append(consistency)
+        if count:
+            scores = scores[:count]
+            means = scores.mean(axis=0).tolist()
+            stds = scores.std(axis=0).tolist()
+        else:
+            means = stds = [0.0, 0.0]
 
         return {
-            "sentiment_accuracy_mean": (
-                np.mean(accuracy_scores) if accuracy_scores else 0.0
-            ),
-            "sentiment_accuracy_std": (
-                np.std(accuracy_scores) if accuracy_scores else 0.0
-            ),
-            "sentiment_consistency_mean": (
-                np.mean(consistency_scores) if consistency_scores else 0.0
-            ),
-            "sentiment_consistency_std": (
-                np.std(consistency_scores) if consistency_scores else 0.0
-            ),
-            "samples_with_sentiment": len(accuracy_scores),
+            "sentiment_accuracy_mean": means[0],
+            "sentiment_accuracy_std": stds[0],
+            "sentiment_consistency_mean": means[1],
+            "sentiment_consistency_std": stds[1],
+            "samples_with_sentiment": count,
         }
 
-    def _compute_sentiment_accuracy(self, text: str, predicted_sentiment: str) -> float:
-        """Вычисление точности sentiment на основе эвристик."""
+    def _count_emotional_words(self, text: str) -> Tuple[int, int]:
+        """Подсчет позитивных и негативных ключевых слов в тексте."""
         text_lower = text.lower()
-
-        # Подсчитываем позитивные и негативные слова
         positive_count = sum(1 for word in self.positive_keywords if word in text_lower)
         negative_count = sum(1 for word in self.negative_keywords if word in text_lower)
+        return positive_count, negative_count
+
+    def _compute_sentiment_accuracy(
+        self, counts: Tuple[int, int], predicted_sentiment: str
+    ) -> float:
+        """Вычисление точности sentiment на основе эвристик."""
+        positive_count, negative_count = counts
 
         # Определяем ожидаемый sentiment
         if positive_count > negative_count:
@@ -135,14 +142,14 @@ class SentimentTest(BaseEvaluator):
         else:
             return 0.0
 
-    def _compute_sentiment_consistency(self, text: str, sentiment: str) -> float:
+    def _compute_sentiment_consistency(
+        self, counts: Tuple[int, int], sentiment: str
+    ) -> float:
         """Вычисление консистентности sentiment."""
-        text_lower = text.lower()
         sentiment_lower = sentiment.lower()
 
-        # Подсчитываем эмоциональные индикаторы в тексте
-        positive_count = sum(1 for word in self.positive_keywords if word in text_lower)
-        negative_count = sum(1 for word in self.negative_keywords if word in text_lower)
+        # Эмоциональные индикаторы в тексте
+        positive_count, negative_count = counts
 
         total_emotional_words = positive_count + negative_count
 
@@ -7,7 +7,7 @@ import asyncio
 from logger import get_logger
 from core.config import settings as config
 from services.db.pg_manager import AsyncPostgresManager
-from services import telegram_monitor
+from services import telegram_monitor, tavily_search
 from bot import dp, bot
 from services.simple_health_check import simple_health_check
 from monitoring_service import MonitoringService
@@ -100,6 +100,9 @@ async def main():
         if telegram_monitor:
             await telegram_monitor.disconnect()  # type: ignore
 
+        # Закрываем HTTP-сессию веб-поиска
+        await tavily_search.close()
+
         # Закрываем соединение с БД
         if data_manager:
             try:
@@ -34,6 +34,9 @@ class MonitoringService:
         self.channel_ids = config.channel_ids
         self.max_concurrent_tasks = max_concurrent_tasks
         self.semaphore = asyncio.Semaphore(max_concurrent_tasks)
+        # Рассылки идут по одной: каждая уже выдерживает темп ~20 msg/s,
+        # параллельные рассылки вместе превысили бы глобальный лимит Telegram
+        self.broadcast_semaphore = asyncio.Semaphore(1)
         self.stats = {
             "processed_messages": 0,
             "failed_messages": 0,
@@ -48,14 +51,19 @@ class MonitoringService:
     async def _process_single_message(
         self, message: Dict[str, Any], channel_id: str
     ) -> bool:
-        """Обрабатывает одно сообщение с семафором для ограничения параллелизма."""
-        async with self.semaphore:
-            async with performance_timer(f"process_message_{channel_id}"):
-                try:
-                    if not self.data_manager:
-                        logger.error("Data manager не инициализирован")
-                        return False
+        """Обрабатывает одно сообщение с семафором для ограничения параллелизма.
+
+        Семафор держится только на время анализа и записи в БД: рассылка
+        уведомления идет уже вне его и не блокирует следующие LLM-запросы.
+        Сами рассылки сериализуются отдельным семафором.
+        """
+        async with performance_timer(f"process_message_{channel_id}"):
+            try:
+                if not self.data_manager:
+                    logger.error("Data manager не инициализирован")
+                    return False
 
+                async with self.semaphore:
                     analysis = await self.analyzer.analyze_message(message["text"])
                     if not analysis:
                         logger.warning(
@@ -64,41 +72,41 @@ class MonitoringService:
                         self.stats["failed_messages"] += 1
                         return False
 
-                    await self.data_manager.save_message(message)
-                    await self.data_manager.save_analysis(
-                        message["id"], analysis.dict()
+                    await self.data_manager.save_message_with_analysis(
+                        message, analysis.dict()
                     )
 
-                    # Формируем и отправляем уведомление
-                    message_link = (
-                        f"https://t.me/{message['channel_username']}/{message['id']}"
-                        if message.get("channel_username")
-                        else "N/A"
-                    )
-                    notification_data = {
-                        "channel_title": message.get(
-                            "channel_title", "Неизвестный источник"
-                        ),
-                        "message_link": message_link,
-                        "summary": analysis.summary,
-                        "sentiment": analysis.sentiment,
-                        "hashtags_formatted": analysis.format_hashtags(),
-                    }
+                # Формируем и отправляем уведомление
+                message_link = (
+                    f"https://t.me/{message['channel_username']}/{message['id']}"
+                    if message.get("channel_username")
+                    else "N/A"
+                )
+                notification_data = {
+                    "channel_title": message.get(
+                        "channel_title", "Неизвестный источник"
+                    ),
+                    "message_link": message_link,
+                    "summary": analysis.summary,
+                    "sentiment": analysis.sentiment,
+                    "hashtags_formatted": analysis.format_hashtags(),
+                }
+                async with self.broadcast_semaphore:
                     await send_analysis_result(self.bot, notification_data)
 
-                    # НЕ обновляем ID здесь - это будет сделано в _process_channel
-                    # после успешной обработки всех сообщений в батче
-                    self.stats["processed_messages"] += 1
-                    return True
+                # НЕ обновляем ID здесь - это будет сделано в _process_channel
+                # после успешной обработки всех сообщений в батче
+                self.stats["processed_messages"] += 1
+                return True
 
-                except Exception as e:
-                    global_error_handler.handle_error(
-                        e,
-                        f"Processing message {message.get('id')} from {channel_id}",
-                        ErrorCategory.SYSTEM,
-                    )
-                    self.stats["failed_messages"] += 1
-                    return False
+            except Exception as e:
+                global_error_handler.handle_error(
+                    e,
+                    f"Processing message {message.get('id')} from {channel_id}",
+                    ErrorCategory.SYSTEM,
+                )
+                self.stats["failed_messages"] += 1
+                return False
 
     async def _process_channel(self, channel_id: str):
         """Обрабатывает один канал: получает и анализирует новые сообщения."""
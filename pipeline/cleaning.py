@@ -9,6 +9,8 @@ __all__ = [
     "clean_and_validate_hashtags",
 ]
 
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+
 
 def truncate_text(
     text: str, max_len: int = settings.MAX_TEXT_LENGTH_FOR_ANALYSIS
@@ -25,7 +27,7 @@ def clean_and_validate_hashtags(raw: List[Any]) -> List[str]:
     for tag in raw:
         if not isinstance(tag, str):
             continue
-        tag_clean = re.sub(r"[^\w\s]", "", tag).strip().replace(" ", "_")
+        tag_clean = _NON_WORD_RE.sub("", tag).strip().replace(" ", "_")
         if tag_clean:
             cleaned.append(tag_clean.lower())
     # deduplicate preserving order
@@ -23,6 +23,18 @@ from logger import get_logger
 
 logger = get_logger()
 
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:  # noqa: ANN401
+        return orjson.dumps(obj).decode()
+
+except ImportError:
+
+    def _json_dumps(obj: Any) -> str:  # noqa: ANN401
+        # Без \uXXXX-экранирования кириллицы: строка короче, JSONB тот же
+        return json.dumps(obj, ensure_ascii=False)
+
 
 class AsyncPostgresManager:  # pylint: disable=too-few-public-methods
     """Asynchronous Postgres manager working via asyncpg connection pool."""
@@ -65,6 +77,9 @@ class AsyncPostgresManager:  # pylint: disable=too-few-public-methods
             PRIMARY KEY(channel_id, message_id)
         );
 
+        -- Выборки «последние N» / «за период» идут по date
+        CREATE INDEX IF NOT EXISTS idx_messages_date ON messages(date DESC);
+
         CREATE TABLE IF NOT EXISTS analyses (
             message_id BIGINT PRIMARY KEY,
             summary    TEXT,
@@ -126,41 +141,67 @@ class AsyncPostgresManager:  # pylint: disable=too-few-public-methods
     # ------------------------------------------------------------------
     # Сохранение сообщений / анализа
     # ------------------------------------------------------------------
+    _INSERT_MESSAGE_SQL = """
+        INSERT INTO messages(channel_id, message_id, text, channel_title, channel_username, date)
+        VALUES ($1, $2, $3, $4, $5, $6)
+        ON CONFLICT DO NOTHING
+    """
+
+    _UPSERT_ANALYSIS_SQL = """
+        INSERT INTO analyses(message_id, summary, sentiment, hashtags)
+        VALUES ($1, $2, $3, $4)
+        ON CONFLICT(message_id) DO UPDATE SET
+            summary   = EXCLUDED.summary,
+            sentiment = EXCLUDED.sentiment,
+            hashtags  = EXCLUDED.hashtags
+    """
+
+    @staticmethod
+    def _message_args(message: Dict[str, Any]) -> tuple:  # noqa: ANN401
+        return (
+            message.get("channel_id"),
+            message.get("id"),
+            message.get("text"),
+            message.get("channel_title"),
+            message.get("channel_username"),
+            message.get("date"),
+        )
+
+    @staticmethod
+    def _analysis_args(message_id: int, analysis: Dict[str, Any]) -> tuple:  # noqa: ANN401
+        return (
+            message_id,
+            analysis.get("summary"),
+            analysis.get("sentiment"),
+            _json_dumps(analysis.get("hashtags", [])),
+        )
+
     async def save_message(self, message: Dict[str, Any]) -> None:  # noqa: ANN401
         async with self.pool.acquire() as conn:
-            await conn.execute(
-                """
-                INSERT INTO messages(channel_id, message_id, text, channel_title, channel_username, date)
-                VALUES ($1, $2, $3, $4, $5, $6)
-                ON CONFLICT DO NOTHING
-                """,
-                message.get("channel_id"),
-                message.get("id"),
-                message.get("text"),
-                message.get("channel_title"),
-                message.get("channel_username"),
-                message.get("date"),
-            )
+            await conn.execute(self._INSERT_MESSAGE_SQL, *self._message_args(message))
 
     async def save_analysis(
         self, message_id: int, analysis: Dict[str, Any]
     ) -> None:  # noqa: ANN401
         async with self.pool.acquire() as conn:
             await conn.execute(
-                """
-                INSERT INTO analyses(message_id, summary, sentiment, hashtags)
-                VALUES ($1, $2, $3, $4)
-                ON CONFLICT(message_id) DO UPDATE SET
-                    summary   = EXCLUDED.summary,
-                    sentiment = EXCLUDED.sentiment,
-                    hashtags  = EXCLUDED.hashtags
-                """,
-                message_id,
-                analysis.get("summary"),
-                analysis.get("sentiment"),
-                json.dumps(analysis.get("hashtags", [])),
+                self._UPSERT_ANALYSIS_SQL, *self._analysis_args(message_id, analysis)
             )
 
+    async def save_message_with_analysis(
+        self, message: Dict[str, Any], analysis: Dict[str, Any]
+    ) -> None:  # noqa: ANN401
+        """Сообщение и его анализ — одним соединением и одной транзакцией."""
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    self._INSERT_MESSAGE_SQL, *self._message_args(message)
+                )
+                await conn.execute(
+                    self._UPSERT_ANALYSIS_SQL,
+                    *self._analysis_args(message.get("id"), analysis),
+                )
+
     # ------------------------------------------------------------------
     # Подписчики
     # ------------------------------------------------------------------
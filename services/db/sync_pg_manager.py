@@ -118,23 +118,18 @@ class SyncPostgresManager:
     def add_subscriber(self, chat_id: int) -> None:
         """Добавляет подписчика."""
         try:
-            # Добавляем подписчика
+            # Подписчик и его настройки одним запросом: один round-trip
+            # и одна неявная транзакция вместо двух в режиме autocommit
             self._execute(
                 """
                 INSERT INTO subscribers(chat_id, is_active)
                 VALUES (%s, TRUE)
-                ON CONFLICT(chat_id) DO UPDATE SET is_active = TRUE
-                """,
-                (chat_id,),
-            )
+                ON CONFLICT(chat_id) DO UPDATE SET is_active = TRUE;
 
-            # Добавляем настройки пользователя
-            self._execute(
-                """
                 INSERT INTO user_settings(chat_id) VALUES (%s)
                 ON CONFLICT DO NOTHING
                 """,
-                (chat_id,),
+                (chat_id, chat_id),
             )
 
             logger.info(f"✅ Добавлен подписчик: {chat_id}")
@@ -221,63 +216,70 @@ class SyncPostgresManager:
     def get_detailed_statistics(self) -> Dict[str, Any]:
         """Возвращает детальную статистику новостей."""
         try:
-            # Общая статистика
+            # Вся статистика одним запросом: один round-trip вместо четырех,
+            # распределения собираются в JSON на стороне сервера
             stats_query = """
-                SELECT 
-                    COUNT(DISTINCT m.message_id) as total_messages,
-                    COUNT(DISTINCT a.message_id) as total_analyses
-                FROM messages m
-                LEFT JOIN analyses a ON m.message_id = a.message_id
+                SELECT
+                    s.total_messages,
+                    s.total_analyses,
+                    (
+                        SELECT COALESCE(json_object_agg(sentiment, count), '{}'::json)
+                        FROM (
+                            SELECT sentiment, COUNT(*) as count
+                            FROM analyses
+                            WHERE sentiment IS NOT NULL
+                            GROUP BY sentiment
+                        ) t
+                    ) as sentiment_distribution,
+                    (
+                        SELECT COALESCE(json_agg(hashtag ORDER BY count DESC), '[]'::json)
+                        FROM (
+                            SELECT jsonb_array_elements_text(hashtags) as hashtag, COUNT(*) as count
+                            FROM analyses
+                            WHERE hashtags IS NOT NULL
+                            GROUP BY hashtag
+                            ORDER BY count DESC
+                            LIMIT 10
+                        ) h
+                    ) as popular_hashtags,
+                    (
+                        SELECT COALESCE(
+                            json_agg(
+                                json_build_object('title', title, 'count', count)
+                                ORDER BY count DESC
+                            ),
+                            '[]'::json
+                        )
+                        FROM (
+                            SELECT
+                                m.channel_title as title,
+                                COUNT(*) as count
+                            FROM messages m
+                            JOIN analyses a ON m.message_id = a.message_id
+                            WHERE m.channel_title IS NOT NULL
+                            GROUP BY m.channel_title
+                            ORDER BY count DESC
+                            LIMIT 5
+                        ) c
+                    ) as top_channels
+                FROM (
+                    SELECT 
+                        COUNT(DISTINCT m.message_id) as total_messages,
+                        COUNT(DISTINCT a.message_id) as total_analyses
+                    FROM messages m
+                    LEFT JOIN analyses a ON m.message_id = a.message_id
+                ) s
             """
             stats_row = self._execute_one(stats_query)
 
-            # Статистика по тональности
-            sentiment_query = """
-                SELECT sentiment, COUNT(*) as count
-                FROM analyses
-                WHERE sentiment IS NOT NULL
-                GROUP BY sentiment
-            """
-            sentiment_rows = self._execute(sentiment_query)
-            sentiment_distribution = {
-                row["sentiment"]: row["count"] for row in sentiment_rows
-            }
-
-            # Популярные хештеги
-            hashtags_query = """
-                SELECT jsonb_array_elements_text(hashtags) as hashtag, COUNT(*) as count
-                FROM analyses
-                WHERE hashtags IS NOT NULL
-                GROUP BY hashtag
-                ORDER BY count DESC
-                LIMIT 10
-            """
-            hashtag_rows = self._execute(hashtags_query)
-            popular_hashtags = [row["hashtag"] for row in hashtag_rows]
-
-            # Топ каналы
-            channels_query = """
-                SELECT 
-                    m.channel_title as title,
-                    COUNT(*) as count
-                FROM messages m
-                JOIN analyses a ON m.message_id = a.message_id
-                WHERE m.channel_title IS NOT NULL
-                GROUP BY m.channel_title
-                ORDER BY count DESC
-                LIMIT 5
-            """
-            channel_rows = self._execute(channels_query)
-            top_channels = [
-                {"title": row["title"], "count": row["count"]} for row in channel_rows
-            ]
-
             return {
                 "total_messages": stats_row["total_messages"] if stats_row else 0,
                 "total_analyses": stats_row["total_analyses"] if stats_row else 0,
-                "sentiment_distribution": sentiment_distribution,
-                "popular_hashtags": popular_hashtags,
-                "top_channels": top_channels,
+                "sentiment_distribution": (
+                    stats_row["sentiment_distribution"] if stats_row else {}
+                ),
+                "popular_hashtags": stats_row["popular_hashtags"] if stats_row else [],
+                "top_channels": stats_row["top_channels"] if stats_row else [],
             }
 
         except Exception as e:
@@ -405,10 +407,18 @@ class SyncPostgresManager:
     def get_statistics(self) -> Dict[str, Any]:
         """Возвращает статистику."""
         try:
-            subscribers = self.get_all_subscribers()
+            # Все счетчики одним запросом вместо выборки списка подписчиков
+            row = self._execute_one(
+                """
+                SELECT
+                    (SELECT COUNT(*) FROM subscribers WHERE is_active = TRUE)
+                        AS subscribers,
+                    (SELECT COUNT(*) FROM messages) AS total_messages
+                """
+            )
             return {
-                "subscribers": len(subscribers),
-                "total_messages": 0,  # Можно добавить подсчет сообщений
+                "subscribers": row["subscribers"] if row else 0,
+                "total_messages": row["total_messages"] if row else 0,
             }
         except Exception as e:
             logger.error(f"Ошибка получения статистики: {e}")
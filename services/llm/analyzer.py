@@ -38,6 +38,39 @@ class NewsAnalysis(BaseModel):
 
 logger = get_logger()
 
+# Шаблон промпта компилируется один раз при импорте, а не на каждый вызов
+_HASHTAG_CATEGORIES = ", ".join(config.HASHTAG_CATEGORIES)
+_ANALYSIS_PROMPT = Template(
+    """
+Проанализируй новость и предоставь СТРОГО JSON-ответ.
+
+Формат ответа:
+{"summary": "краткое содержание", "sentiment": "тональность", "hashtags": ["тег1", "тег2"]}
+
+Правила:
+1. summary: Краткое содержание (максимум {{ max_summary }} символов)
+2. sentiment: ТОЛЬКО одно из: "Позитивная", "Негативная", "Нейтральная"
+3. hashtags: 3-5 тегов из категорий: {{ categories }}
+
+ПРИМЕРЫ:
+Текст: "Центробанк повысил ключевую ставку до 21%"
+{"summary": "ЦБ РФ повысил ключевую ставку до рекордных 21%", "sentiment": "Негативная", "hashtags": ["экономика", "финансы", "центробанк"]}
+
+Текст: "Российские ученые создали новый материал для космоса"
+{"summary": "Российские ученые разработали инновационный материал для космической промышленности", "sentiment": "Позитивная", "hashtags": ["наука_и_технологии", "космос", "инновации"]}
+
+Текст: {{ text }}
+
+JSON:
+"""
+)
+# Все, кроме текста, константно: рендерим один раз и режем по месту {{ text }}
+_PROMPT_PREFIX, _PROMPT_SUFFIX = _ANALYSIS_PROMPT.render(
+    max_summary=config.MAX_SUMMARY_LENGTH,
+    categories=_HASHTAG_CATEGORIES,
+    text="\x00",
+).split("\x00", 1)
+
 
 class LRUCacheWithTTL:
     """LRU cache with TTL support."""
@@ -88,6 +121,7 @@ class OllamaAnalyzer:
         cache_ttl: int = config.DEFAULT_CACHE_TTL_SECONDS,
     ):
         self.logger = get_logger()
+        self.model = model
         self.max_concurrent_requests = max_concurrent_requests
         self.semaphore = asyncio.Semaphore(max_concurrent_requests)
         self.analysis_cache = LRUCacheWithTTL(cache_size, cache_ttl)
@@ -102,6 +136,7 @@ class OllamaAnalyzer:
                 top_p=0.9,
                 repeat_penalty=1.1,
                 format="json",  # гарантирует корректный JSON
+                keep_alive=config.OLLAMA_KEEP_ALIVE,
             )
 
             # Отдельный экземпляр LLM **без** JSON-format для обычного чата
@@ -111,6 +146,7 @@ class OllamaAnalyzer:
                 temperature=0.2,
                 top_p=0.9,
                 repeat_penalty=1.1,
+                keep_alive=config.OLLAMA_KEEP_ALIVE,
             )
 
             # Флаг для отслеживания проверки модели
@@ -136,41 +172,16 @@ class OllamaAnalyzer:
 
     # ----------------------------------------------- internal helpers ----
     def _get_cache_key(self, text: str) -> str:
-        return hashlib.md5(text.encode("utf-8")).hexdigest()
+        # Модель входит в ключ: один и тот же текст у разных моделей — разные результаты.
+        # Пробелы схлопываем: репосты между каналами часто отличаются только ими
+        normalized = " ".join(text.split())
+        return hashlib.blake2b(
+            f"{self.model}|{normalized}".encode("utf-8"), digest_size=16
+        ).hexdigest()
 
     def _get_optimized_prompt(self, message_text: str) -> str:
         safe_text = truncate_text(message_text, config.MAX_TEXT_LENGTH_FOR_ANALYSIS)
-        hashtag_categories = ", ".join(config.HASHTAG_CATEGORIES)
-
-        template = Template(
-            """
-Проанализируй новость и предоставь СТРОГО JSON-ответ.
-
-Формат ответа:
-{"summary": "краткое содержание", "sentiment": "тональность", "hashtags": ["тег1", "тег2"]}
-
-Правила:
-1. summary: Краткое содержание (максимум {{ max_summary }} символов)
-2. sentiment: ТОЛЬКО одно из: "Позитивная", "Негативная", "Нейтральная"
-3. hashtags: 3-5 тегов из категорий: {{ categories }}
-
-ПРИМЕРЫ:
-Текст: "Центробанк повысил ключевую ставку до 21%"
-{"summary": "ЦБ РФ повысил ключевую ставку до рекордных 21%", "sentiment": "Негативная", "hashtags": ["экономика", "финансы", "центробанк"]}
-
-Текст: "Российские ученые создали новый материал для космоса"
-{"summary": "Российские ученые разработали инновационный материал для космической промышленности", "sentiment": "Позитивная", "hashtags": ["наука_и_технологии", "космос", "инновации"]}
-
-Текст: {{ text }}
-
-JSON:
-"""
-        )
-        return template.render(
-            max_summary=config.MAX_SUMMARY_LENGTH,
-            categories=hashtag_categories,
-            text=safe_text,
-        )
+        return _PROMPT_PREFIX + safe_text + _PROMPT_SUFFIX
 
     # ------------------------------------------------------------------
     # Streaming helper (используется в чате)
@@ -258,9 +269,7 @@ JSON:
                         try:
                             # Запускаем без ожидания внутри фоновой задачи,
                             # чтобы не блокировать основной анализ.
-                            import asyncio as _asyncio
-
-                            _asyncio.create_task(
+                            asyncio.create_task(
                                 services.data_manager.log_llm_call(
                                     prompt,
                                     response_str,
@@ -8,6 +8,7 @@ logger = get_logger()
 
 class TavilySearch:
     def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
         self.api_key = config.TAVILY_API_KEY
         if not self.api_key:
             logger.warning("TAVILY_API_KEY не установлен. Поиск будет недоступен.")
@@ -20,6 +21,22 @@ class TavilySearch:
             "Content-Type": "application/json",
         }
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Общая HTTP-сессия с keep-alive (создается лениво внутри event loop)."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=30),
+                connector=aiohttp.TCPConnector(ttl_dns_cache=300, keepalive_timeout=75),
+            )
+        return self._session
+
+    async def close(self):
+        """Закрывает HTTP-сессию."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
     async def search(
         self, query: str, max_results: int = 3
     ) -> Optional[List[Dict[str, Any]]]:
@@ -31,27 +48,25 @@ class TavilySearch:
             return None
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.base_url,
-                    headers=self.headers,
-                    json={
-                        "query": query,
-                        "max_results": max_results,
-                        "search_depth": "basic",
-                        "include_answer": False,
-                        "include_raw_content": False,
-                    },
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get("results", [])
-                    else:
-                        error_text = await response.text()
-                        logger.error(
-                            f"Ошибка при поиске: {response.status} - {error_text}"
-                        )
-                        return None
+            async with self._get_session().post(
+                self.base_url,
+                json={
+                    "query": query,
+                    "max_results": max_results,
+                    "search_depth": "basic",
+                    "include_answer": False,
+                    "include_raw_content": False,
+                },
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return data.get("results", [])
+                else:
+                    error_text = await response.text()
+                    logger.error(
+                        f"Ошибка при поиске: {response.status} - {error_text}"
+                    )
+                    return None
 
         except Exception as e:
             logger.error(f"Ошибка при выполнении поиска: {e}")
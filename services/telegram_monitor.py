@@ -271,12 +271,15 @@ class TelegramMonitor:
             return False
 
     async def validate_all_channels(self, channel_ids: List[str]) -> List[str]:
-        """Проверка доступа ко всем каналам."""
-        valid_channels = []
+        """Проверка доступа ко всем каналам (параллельно, с ограничением)."""
+        semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_REQUESTS)
 
-        for channel_id in channel_ids:
-            if await self.test_channel_access(channel_id):
-                valid_channels.append(channel_id)
+        async def _check(channel_id: str) -> bool:
+            async with semaphore:
+                return await self.test_channel_access(channel_id)
+
+        results = await asyncio.gather(*(_check(cid) for cid in channel_ids))
+        valid_channels = [cid for cid, ok in zip(channel_ids, results) if ok]
 
         logger.info(f"Доступно каналов: {len(valid_channels)}/{len(channel_ids)}")
         return valid_channels
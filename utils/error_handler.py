@@ -2,12 +2,15 @@
 
 import asyncio
 import logging
+import random
 import time
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional, Type, Union
+from typing import Any, Callable, Deque, Dict, Optional, Type, Union
 from logger import get_logger
+from core.config import settings
 
 logger = get_logger()
 
@@ -40,7 +43,7 @@ class ErrorHandler:
 
     def __init__(self):
         self.error_counts: Dict[ErrorCategory, int] = {}
-        self.last_errors: Dict[ErrorCategory, List[str]] = {}
+        self.last_errors: Dict[ErrorCategory, Deque[str]] = {}
 
     def categorize_error(self, error: Exception) -> ErrorCategory:
         """Определяет категорию ошибки."""
@@ -110,14 +113,13 @@ class ErrorHandler:
         # Увеличиваем счетчик
         self.error_counts[category] = self.error_counts.get(category, 0) + 1
 
-        # Сохраняем последние ошибки
-        if category not in self.last_errors:
-            self.last_errors[category] = []
-        self.last_errors[category].append(f"{context}: {str(error)}")
-
-        # Оставляем только последние 10 ошибок
-        if len(self.last_errors[category]) > 10:
-            self.last_errors[category] = self.last_errors[category][-10:]
+        # Сохраняем последние ошибки: кольцевой буфер сам вытесняет старые
+        history = self.last_errors.get(category)
+        if history is None:
+            history = self.last_errors[category] = deque(
+                maxlen=settings.MAX_ERROR_HISTORY_PER_CATEGORY
+            )
+        history.append(f"{context}: {str(error)}")
 
         # Логируем с соответствующим уровнем
         log_level = self._get_log_level(category)
@@ -185,8 +187,6 @@ def retry_with_backoff(
                             )
 
                             if config.jitter:
-                                import random
-
                                 delay *= 0.5 + random.random() * 0.5
 
                             logger.info(f"Retrying {func.__name__} in {delay:.2f}s...")
@@ -229,8 +229,6 @@ def retry_with_backoff(
                             )
 
                             if config.jitter:
-                                import random
-
                                 delay *= 0.5 + random.random() * 0.5
 
                             logger.info(f"Retrying {func.__name__} in {delay:.2f}s...")
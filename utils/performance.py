@@ -4,15 +4,16 @@
 import asyncio
 import time
 import psutil
+from collections import deque
 from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, List, Optional, Any
 from logger import get_logger
 
 logger = get_logger()
 
 
-@dataclass
+@dataclass(slots=True)
 class PerformanceMetrics:
     """Метрики производительности."""
 
@@ -28,7 +29,8 @@ class PerformanceMonitor:
     """Монитор производительности системы."""
 
     def __init__(self, max_metrics: int = 1000):
-        self.metrics: List[PerformanceMetrics] = []
+        # Кольцевой буфер: старые метрики вытесняются без копирования списка
+        self.metrics: Deque[PerformanceMetrics] = deque(maxlen=max_metrics)
         self.max_metrics = max_metrics
         self.operation_stats: Dict[str, Dict[str, float]] = {}
 
@@ -36,10 +38,6 @@ class PerformanceMonitor:
         """Записывает метрику производительности."""
         self.metrics.append(metric)
 
-        # Ограничиваем количество метрик
-        if len(self.metrics) > self.max_metrics:
-            self.metrics = self.metrics[-self.max_metrics :]
-
         # Обновляем статистику по операциям
         op_name = metric.operation_name
         if op_name not in self.operation_stats:
@@ -106,7 +104,7 @@ async def performance_timer(
         monitor = global_performance_monitor
 
     # Получаем начальные метрики
-    start_time = time.time()
+    start_time = time.perf_counter()
     memory_before = psutil.Process().memory_info().rss / 1024 / 1024  # MB
     cpu_before = psutil.cpu_percent()
 
@@ -114,7 +112,7 @@ async def performance_timer(
         yield
     finally:
         # Получаем финальные метрики
-        end_time = time.time()
+        end_time = time.perf_counter()
         memory_after = psutil.Process().memory_info().rss / 1024 / 1024  # MB
         execution_time = end_time - start_time
 
@@ -145,7 +143,7 @@ def sync_performance_timer(
         monitor = global_performance_monitor
 
     # Получаем начальные метрики
-    start_time = time.time()
+    start_time = time.perf_counter()
     memory_before = psutil.Process().memory_info().rss / 1024 / 1024  # MB
     cpu_before = psutil.cpu_percent()
 
@@ -153,7 +151,7 @@ def sync_performance_timer(
         yield
     finally:
         # Получаем финальные метрики
-        end_time = time.time()
+        end_time = time.perf_counter()
         memory_after = psutil.Process().memory_info().rss / 1024 / 1024  # MB
         execution_time = end_time - start_time
 